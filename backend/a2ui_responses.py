@@ -28,6 +28,19 @@ def get_a2ui_response(message: str) -> Dict[str, Any]:
     - text: Optional plain text
     - a2ui: Optional A2UI protocol JSON
     """
+    response = get_static_response(message)
+    if response is not None:
+        return response
+    return get_ai_response(message)
+
+
+def get_static_response(message: str) -> Optional[Dict[str, Any]]:
+    """
+    Generate a response without calling an AI model.
+    
+    Returns None when the message matches no handler and OpenAI is
+    configured, i.e. when get_a2ui_response would make a live AI call.
+    """
     lower_message = message.lower()
     
     # Route to specific handlers based on message content
@@ -50,9 +63,9 @@ def get_a2ui_response(message: str) -> Dict[str, Any]:
     if 'compare' in lower_message and (' vs ' in lower_message or ' versus ' in lower_message):
         return get_compare_response(message)
     
-    # Default: try AI or return generic response
+    # Default: leave to AI, or return generic response
     if HAS_OPENAI:
-        return get_ai_response(message)
+        return None
     
     return get_default_response(message)
 
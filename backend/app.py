@@ -2,7 +2,7 @@
 A2UI Backend API
 
 Security:
-- Configurable CORS origins (env: A2UI_CORS_ORIGINS)
+- Configurable CORS origins (env: A2UI_CORS_ORIGINS, A2UI_CORS_ORIGIN_REGEX)
 - Optional API key auth (env: A2UI_API_KEY) — disabled when unset
 - Rate limiting via slowapi
 - Input validation via Pydantic
@@ -10,20 +10,24 @@ Security:
 - Request body size limits (1 MB)
 """
 
+import functools
+import logging
 import os
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional, Type, TypeVar
 
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, ValidationError, field_validator
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
+import orjson
 import uvicorn
 
 from openai_service import get_openai_completion
-from a2ui_responses import get_a2ui_response
+from a2ui_responses import get_a2ui_response, get_static_response
 from llm_providers import llm_service
 
 
@@ -35,34 +39,54 @@ ALLOWED_ORIGINS = [
         "A2UI_CORS_ORIGINS",
         "http://localhost:5174,http://localhost:5173,http://localhost:3000",
     ).split(",")
+    if o.strip()
 ]
+# Optional pattern for origins, e.g. r"^https?://(localhost|127\.0\.0\.1)(:\d+)?$"
+ALLOWED_ORIGIN_REGEX = os.getenv("A2UI_CORS_ORIGIN_REGEX") or None
 
 API_KEY = os.getenv("A2UI_API_KEY")          # set to require auth; unset = open
 MAX_BODY_BYTES = 1_000_000                    # 1 MB
 DEBUG = os.getenv("A2UI_DEBUG", "false").lower() == "true"
+REDIS_URL = os.getenv("A2UI_REDIS_URL")      # shared rate limits + LLM cache; needs `redis`
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
+# App modules log under the "a2ui" parent logger (getLogger(f"a2ui.{__name__}")).
+# DEBUG applies only to that tree; httpx/openai/anthropic debug logs
+# include full request options and user prompts.
+if DEBUG:
+    logging.getLogger("a2ui").setLevel(logging.DEBUG)
+logger = logging.getLogger(f"a2ui.{__name__}")
 
 
 # ── App Setup ──────────────────────────────────────────────────
 
 app = FastAPI(
     title="A2UI API",
+    default_response_class=ORJSONResponse,
     docs_url="/api/docs" if DEBUG else None,   # hide docs in prod
     redoc_url=None,
 )
 
-# Rate limiter
-limiter = Limiter(key_func=get_remote_address)
+# Rate limiter — counts live in Redis when configured so limits hold
+# across workers; in-memory counts are per-process.
+limiter = Limiter(key_func=get_remote_address, storage_uri=REDIS_URL or "memory://")
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
-# CORS — restricted to known origins
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=ALLOWED_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "OPTIONS"],
-    allow_headers=["Content-Type", "X-API-Key"],
-)
+# CORS — restricted to known origins. Skipped entirely when no origins are
+# configured (A2UI_CORS_ORIGINS=""), e.g. frontend served from the same origin.
+if ALLOWED_ORIGINS or ALLOWED_ORIGIN_REGEX:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=ALLOWED_ORIGINS,
+        allow_origin_regex=ALLOWED_ORIGIN_REGEX,
+        allow_credentials=True,
+        allow_methods=["GET", "POST"],
+        allow_headers=["Content-Type", "X-API-Key"],
+    )
 
 
 @app.middleware("http")
@@ -72,7 +96,7 @@ async def security_middleware(request: Request, call_next):
     # ── Request body size limit ────────────────────────────────
     content_length = request.headers.get("content-length")
     if content_length and int(content_length) > MAX_BODY_BYTES:
-        return JSONResponse(
+        return ORJSONResponse(
             content={"error": "Request body too large"},
             status_code=413,
         )
@@ -85,7 +109,7 @@ async def security_middleware(request: Request, call_next):
     ):
         provided = request.headers.get("X-API-Key")
         if provided != API_KEY:
-            return JSONResponse(
+            return ORJSONResponse(
                 content={"error": "Unauthorized"},
                 status_code=401,
             )
@@ -112,14 +136,14 @@ class ChatRequest(BaseModel):
     message: str = Field(..., min_length=1, max_length=10_000)
     provider: Optional[str] = Field(None, max_length=50)
     model: Optional[str] = Field(None, max_length=100)
-    history: List[HistoryMessage] = Field(default_factory=list)
+    history: List[HistoryMessage] = Field(default_factory=list, max_length=50)
     enableWebSearch: bool = False
 
-    @field_validator("history")
+    @field_validator("message")
     @classmethod
-    def limit_history(cls, v):
-        if len(v) > 50:
-            raise ValueError("History exceeds maximum of 50 messages")
+    def require_content(cls, v):
+        if not v.strip():
+            raise ValueError("Message is required")
         return v
 
 
@@ -127,12 +151,91 @@ class OpenAIRequest(BaseModel):
     prompt: str = Field(..., min_length=1, max_length=10_000)
 
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def json_body(model: Type[ModelT]) -> Callable:
+    """
+    Dependency that parses the raw request body straight into `model`.
+
+    Uses pydantic's Rust JSON parser (model_validate_json) instead of
+    FastAPI's default stdlib json.loads + validate round trip. Errors are
+    reported as the usual 422 validation response. Pair with
+    json_body_openapi(model) on the route so the body stays documented.
+    """
+    async def parse(request: Request) -> ModelT:
+        # Like FastAPI, treat a missing Content-Type as JSON
+        content_type = request.headers.get("content-type", "application/json")
+        media_type = content_type.split(";")[0].strip().lower()
+        if media_type != "application/json" and not media_type.endswith("+json"):
+            raise HTTPException(status_code=415, detail="Content-Type must be application/json")
+        try:
+            return model.model_validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+            ) from e
+
+    return parse
+
+
+def json_body_openapi(model: Type[BaseModel]) -> Dict[str, Any]:
+    """OpenAPI requestBody for a route that reads its body via json_body(model)."""
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+
+    def inline(node):
+        # Resolve local $defs refs so the schema is self-contained
+        if isinstance(node, dict):
+            ref = node.get("$ref", "")
+            if ref.startswith("#/$defs/"):
+                return inline(defs[ref.rsplit("/", 1)[-1]])
+            return {k: inline(v) for k, v in node.items()}
+        if isinstance(node, list):
+            return [inline(v) for v in node]
+        return node
+
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": inline(schema)}},
+        }
+    }
+
+
 # ── Routes ─────────────────────────────────────────────────────
 
+# Static payloads are serialized once at startup; provider availability
+# is fixed by the env keys present when the process starts.
+HOME_BYTES = orjson.dumps({"message": "Welcome to the A2UI Python Backend!"})
+PROVIDERS_BYTES = orjson.dumps({"providers": llm_service.get_available_providers()})
+
+
+@functools.lru_cache(maxsize=1024)
+def _static_bytes(message: str) -> Optional[bytes]:
+    response = get_static_response(message)
+    return orjson.dumps(response) if response is not None else None
+
+
+def fallback_bytes(message: str) -> bytes:
+    """
+    Serialized mock/fallback A2UI response for a message.
+
+    Keyword-handler responses are served from an LRU cache of pre-serialized
+    bytes. Messages that fall through to a live AI call (get_ai_response)
+    are never cached. Whitespace is normalized but case is kept, since some
+    fallback responses echo the message back.
+    """
+    cached = _static_bytes(" ".join(message.split()))
+    if cached is not None:
+        return cached
+    return orjson.dumps(get_a2ui_response(message))
+
+
 @app.get("/api")
 @limiter.limit("60/minute")
 def home(request: Request):
-    return JSONResponse(content={"message": "Welcome to the A2UI Python Backend!"})
+    return Response(content=HOME_BYTES, media_type="application/json")
 
 
 @app.get("/api/providers")
@@ -143,14 +246,13 @@ def get_providers(request: Request):
 
     Returns providers that have valid API keys configured.
     """
-    providers = llm_service.get_available_providers()
-    return JSONResponse(content={"providers": providers})
+    return Response(content=PROVIDERS_BYTES, media_type="application/json")
 
 
 # A2UI Chat endpoint — returns structured A2UI responses
-@app.post("/api/chat")
+@app.post("/api/chat", openapi_extra=json_body_openapi(ChatRequest))
 @limiter.limit("20/minute")
-async def chat(request: Request, body: ChatRequest):
+async def chat(request: Request, body: ChatRequest = Depends(json_body(ChatRequest))):
     """
     Chat endpoint that returns A2UI protocol responses.
 
@@ -165,12 +267,6 @@ async def chat(request: Request, body: ChatRequest):
     - text: Optional plain text response
     - a2ui: Optional A2UI protocol JSON for rich UI rendering
     """
-    if not body.message.strip():
-        return JSONResponse(
-            content={"error": "Message is required"},
-            status_code=400,
-        )
-
     # If provider is specified, use LLM service
     if body.provider and body.model:
         try:
@@ -182,45 +278,112 @@ async def chat(request: Request, body: ChatRequest):
                 history=history_dicts,
                 enable_web_search=body.enableWebSearch,
             )
-            return JSONResponse(content=response)
+            return ORJSONResponse(content=response)
         except ValueError as e:
             # Known errors (invalid provider, etc.)
-            return JSONResponse(
+            return ORJSONResponse(
                 content={"error": str(e)},
                 status_code=400,
             )
         except Exception as e:
             # Log full error server-side; return generic message to client
-            print(f"LLM error: {e}")
-            response = get_a2ui_response(body.message)
+            logger.exception("LLM error: %s", e)
+            response = orjson.loads(fallback_bytes(body.message))
             response["_error"] = "An error occurred while generating the response"
-            return JSONResponse(content=response)
+            return ORJSONResponse(content=response)
 
     # Otherwise use mock/fallback responses
-    response = get_a2ui_response(body.message)
-    return JSONResponse(content=response)
+    return Response(content=fallback_bytes(body.message), media_type="application/json")
+
+
+def _sse(event: str, data: dict) -> bytes:
+    """Format one Server-Sent Events message."""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+# Streaming A2UI chat endpoint — Server-Sent Events
+@app.post("/api/chat/stream", openapi_extra=json_body_openapi(ChatRequest))
+@limiter.limit("20/minute")
+async def chat_stream(
+    request: Request, body: ChatRequest = Depends(json_body(ChatRequest))
+):
+    """
+    Streaming variant of /api/chat using Server-Sent Events.
+
+    Takes the same request body as /api/chat; provider and model are required.
+
+    Events:
+    - delta: {"text": "..."} raw response text as the LLM produces it
+    - result: the final parsed A2UI response (same shape as /api/chat)
+    """
+    if not (body.provider and body.model):
+        return ORJSONResponse(
+            content={"error": "Provider and model are required for streaming"},
+            status_code=400,
+        )
+
+    if not llm_service.get_provider(body.provider):
+        return ORJSONResponse(
+            content={"error": f"Provider '{body.provider}' is not available"},
+            status_code=400,
+        )
+
+    history_dicts = [h.model_dump() for h in body.history]
+
+    async def event_source():
+        try:
+            async for event, data in llm_service.stream(
+                body.message,
+                body.provider,
+                body.model,
+                history=history_dicts,
+                enable_web_search=body.enableWebSearch,
+            ):
+                yield _sse(event, data)
+        except Exception as e:
+            # Log full error server-side; fall back to a mock response
+            logger.exception("LLM stream error: %s", e)
+            response = orjson.loads(fallback_bytes(body.message))
+            response["_error"] = "An error occurred while generating the response"
+            yield _sse("result", response)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # Legacy OpenAI completion endpoint
-@app.post("/api/openai")
+@app.post("/api/openai", openapi_extra=json_body_openapi(OpenAIRequest))
 @limiter.limit("10/minute")
-async def openai_completion(request: Request, body: OpenAIRequest):
+async def openai_completion(
+    request: Request, body: OpenAIRequest = Depends(json_body(OpenAIRequest))
+):
     result = get_openai_completion(body.prompt)
     if "error" in result:
-        return JSONResponse(
+        return ORJSONResponse(
             content={"error": "An error occurred processing your request"},
             status_code=result["status_code"],
         )
-    return JSONResponse(
+    return ORJSONResponse(
         content={"response": result["response"]},
         status_code=result["status_code"],
     )
 
 
 if __name__ == "__main__":
+    # Without Redis, rate limits and caches are per-process, so N workers
+    # would multiply the per-client limits by N. Default to one worker
+    # then; with A2UI_REDIS_URL, default to one worker per CPU.
+    default_workers = (os.cpu_count() or 1) if REDIS_URL else 1
+    workers = 1 if DEBUG else int(os.getenv("A2UI_WORKERS", default_workers))
     uvicorn.run(
         "app:app",
-        host="127.0.0.1",
-        port=8000,
+        host=os.getenv("A2UI_HOST", "127.0.0.1"),
+        port=int(os.getenv("A2UI_PORT", "8000")),
+        loop="auto",          # uvloop when installed
+        http="auto",          # httptools when installed
+        workers=workers,
         reload=DEBUG,
     )
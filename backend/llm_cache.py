@@ -0,0 +1,257 @@
+"""
+LLM Response Cache
+
+Two-tier cache consulted before dispatching to a paid LLM provider:
+- Exact match: SHA-256 of (provider, model, normalized message, history)
+- Semantic match (optional): embedding cosine similarity for near-duplicate
+  prompts, using sentence-transformers when installed
+
+Backends:
+- In-process LRU (default)
+- Redis (env: A2UI_REDIS_URL) — shared across workers
+
+Configuration:
+- A2UI_CACHE: "false" disables caching entirely (default "true")
+- A2UI_CACHE_TTL: seconds to keep a response (default 3600)
+- A2UI_SEMANTIC_CACHE: "true" enables the embedding tier (default "false")
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+logger = logging.getLogger(f"a2ui.{__name__}")
+
+CACHE_ENABLED = os.getenv("A2UI_CACHE", "true").lower() == "true"
+CACHE_TTL = int(os.getenv("A2UI_CACHE_TTL", "3600"))
+REDIS_URL = os.getenv("A2UI_REDIS_URL")
+SEMANTIC_ENABLED = os.getenv("A2UI_SEMANTIC_CACHE", "false").lower() == "true"
+
+SEMANTIC_MODEL = "all-MiniLM-L6-v2"
+SEMANTIC_THRESHOLD = 0.95
+
+
+def normalize_message(message: str) -> str:
+    """Collapse whitespace and case so trivially different prompts share a key."""
+    return " ".join(message.split()).lower()
+
+
+def cache_key(
+    provider_id: str,
+    model: str,
+    message: str,
+    history: Optional[List[Dict[str, str]]] = None,
+) -> str:
+    """Build a stable SHA-256 key for a generate() call."""
+    payload = {
+        "provider": provider_id,
+        "model": model,
+        "message": normalize_message(message),
+        "history": history or [],
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class CacheBackend(Protocol):
+    """Key/value store for cached LLM responses."""
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: int = CACHE_TTL) -> None:
+        ...
+
+
+class MemoryCache:
+    """In-process LRU cache with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        # Callers decorate responses (e.g. "_search"), so hand out a copy
+        return copy.deepcopy(value)
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: int = CACHE_TTL) -> None:
+        self._entries[key] = (time.monotonic() + ttl, copy.deepcopy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class RedisCache:
+    """Redis-backed cache so all workers share hits."""
+
+    def __init__(self, url: str, prefix: str = "a2ui:llm:"):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = await self._redis.get(self.prefix + key)
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: int = CACHE_TTL) -> None:
+        await self._redis.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+
+class SemanticCache:
+    """
+    Near-duplicate lookup over prompt embeddings.
+
+    Entries are scoped by provider/model/history so a hit is only returned
+    for the same conversation context. Embedding runs in a worker thread to
+    keep the event loop free.
+    """
+
+    def __init__(
+        self,
+        model_name: str = SEMANTIC_MODEL,
+        threshold: float = SEMANTIC_THRESHOLD,
+        max_entries: int = 1024,
+    ):
+        import numpy as np
+        from sentence_transformers import SentenceTransformer
+
+        self._np = np
+        self._encoder = SentenceTransformer(model_name)
+        self.threshold = threshold
+        self.max_entries = max_entries
+        # scope -> list of (expires_at, unit embedding, response)
+        self._entries: Dict[str, List[Tuple[float, Any, Dict[str, Any]]]] = {}
+        self._size = 0
+
+    async def _embed(self, text: str):
+        return await asyncio.to_thread(
+            self._encoder.encode, normalize_message(text), normalize_embeddings=True
+        )
+
+    async def get(self, scope: str, message: str) -> Optional[Dict[str, Any]]:
+        entries = self._entries.get(scope)
+        if not entries:
+            return None
+        now = time.monotonic()
+        live = [e for e in entries if e[0] >= now]
+        self._size -= len(entries) - len(live)
+        self._entries[scope] = live
+        if not live:
+            return None
+
+        query = await self._embed(message)
+        matrix = self._np.stack([e[1] for e in live])
+        scores = matrix @ query
+        best = int(scores.argmax())
+        if scores[best] >= self.threshold:
+            return copy.deepcopy(live[best][2])
+        return None
+
+    async def set(
+        self, scope: str, message: str, value: Dict[str, Any], ttl: int = CACHE_TTL
+    ) -> None:
+        if self._size >= self.max_entries:
+            self._entries.clear()
+            self._size = 0
+        embedding = await self._embed(message)
+        self._entries.setdefault(scope, []).append(
+            (time.monotonic() + ttl, embedding, copy.deepcopy(value))
+        )
+        self._size += 1
+
+
+class ResponseCache:
+    """Exact-match cache with an optional semantic fallback tier."""
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        semantic: Optional[SemanticCache] = None,
+        ttl: int = CACHE_TTL,
+    ):
+        self.backend = backend
+        self.semantic = semantic
+        self.ttl = ttl
+
+    @staticmethod
+    def _scope(provider_id: str, model: str, history: Optional[List[Dict[str, str]]]) -> str:
+        return cache_key(provider_id, model, "", history)
+
+    async def get(
+        self,
+        key: str,
+        provider_id: str,
+        model: str,
+        message: str,
+        history: Optional[List[Dict[str, str]]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Look up a response by exact key, then by semantic similarity."""
+        try:
+            hit = await self.backend.get(key)
+            if hit is None and self.semantic:
+                hit = await self.semantic.get(self._scope(provider_id, model, history), message)
+            return hit
+        except Exception as e:
+            logger.warning("Cache lookup failed (continuing without cache): %s", e)
+            return None
+
+    async def set(
+        self,
+        key: str,
+        provider_id: str,
+        model: str,
+        message: str,
+        value: Dict[str, Any],
+        history: Optional[List[Dict[str, str]]] = None,
+    ) -> None:
+        """Store a response in every enabled tier."""
+        try:
+            await self.backend.set(key, value, ttl=self.ttl)
+            if self.semantic:
+                await self.semantic.set(
+                    self._scope(provider_id, model, history), message, value, ttl=self.ttl
+                )
+        except Exception as e:
+            logger.warning("Cache store failed: %s", e)
+
+
+def _build_response_cache() -> Optional[ResponseCache]:
+    if not CACHE_ENABLED:
+        return None
+
+    backend: CacheBackend = MemoryCache()
+    if REDIS_URL:
+        try:
+            backend = RedisCache(REDIS_URL)
+        except ImportError:
+            logger.warning("Cache: redis package not installed, using in-memory cache")
+
+    semantic = None
+    if SEMANTIC_ENABLED:
+        try:
+            semantic = SemanticCache()
+        except ImportError:
+            logger.warning("Cache: sentence-transformers not installed, semantic tier disabled")
+
+    return ResponseCache(backend, semantic)
+
+
+# Global instance (None when caching is disabled)
+response_cache = _build_response_cache()
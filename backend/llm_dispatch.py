@@ -0,0 +1,55 @@
+"""
+LLM Request Dispatcher
+
+Caps concurrent calls per provider, shared by generate() and stream():
+- Requests are dispatched immediately; there is no batching window
+- A semaphore limits in-flight provider calls, so bursts wait here
+  instead of tripping the provider's rate limit
+- Calls run in the caller's task, so cancelling the caller (e.g. a
+  client disconnect) also cancels the upstream request
+
+Chat completion APIs take a single conversation per call, so grouping
+requests into batches would only add latency without saving any calls.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+MAX_CONCURRENCY = 32
+
+
+class ProviderDispatcher:
+    """Concurrency-limited gateway to a single LLM provider."""
+
+    def __init__(self, provider: Any, max_concurrency: int = MAX_CONCURRENCY):
+        self.provider = provider
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the server's event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def submit(
+        self,
+        message: str,
+        model: str,
+        history: Optional[List[Dict[str, str]]] = None,
+    ) -> Dict[str, Any]:
+        """Run provider.generate() once a concurrency slot is free."""
+        async with self.semaphore:
+            return await self.provider.generate(message, model, history)
+
+    async def stream(
+        self,
+        message: str,
+        model: str,
+        history: Optional[List[Dict[str, str]]] = None,
+    ) -> AsyncIterator[str]:
+        """Stream provider.stream() chunks, holding a slot until it finishes."""
+        async with self.semaphore:
+            async for text in self.provider.stream(message, model, history):
+                yield text
@@ -9,11 +9,41 @@ Supports multiple AI providers:
 Each provider can generate A2UI JSON responses.
 """
 
+import asyncio
+import copy
+import logging
 import os
-import json
-import re
-from typing import Any, Dict, List, Optional
-from abc import ABC, abstractmethod
+import string
+from typing import Any, AsyncIterator, Dict, List, Optional, Protocol, Tuple
+
+import anthropic
+import google.generativeai as genai
+import httpx
+import openai
+import orjson
+
+from llm_cache import cache_key, response_cache
+from llm_dispatch import ProviderDispatcher
+
+logger = logging.getLogger(f"a2ui.{__name__}")
+
+
+# Shared connection settings for provider HTTP clients. Each provider keeps
+# one pooled HTTP/2 client for the process lifetime so requests reuse TCP/TLS
+# connections instead of paying the handshake on every call.
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+HTTP_TIMEOUT = 60.0
+
+# Upper bound on web search before answering without search context
+SEARCH_TIMEOUT = float(os.getenv("A2UI_SEARCH_TIMEOUT", "5"))
+
+
+def build_http_client() -> httpx.AsyncClient:
+    """Create a pooled HTTP/2 client for an LLM provider SDK."""
+    return httpx.AsyncClient(http2=True, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+
+
+FENCE_TAG_CHARS = string.ascii_letters + string.digits + "_"
 
 
 def parse_llm_json(content: str) -> Dict[str, Any]:
@@ -22,28 +52,36 @@ def parse_llm_json(content: str) -> Dict[str, Any]:
     
     Strips markdown fences, extracts JSON, and returns a dict.
     Providers should use JSON mode when available so this is just a safety net.
+    
+    If the content is not a JSON object, returns {"text": content} with
+    "_parse_error": True so callers can avoid caching the raw output.
     """
     content = content.strip()
     
-    # Strip markdown code fences
+    # Strip markdown code fences (```json ... ```) — only the backticks
+    # and language tag, since the JSON may start on the same line
     if content.startswith("```"):
-        content = re.sub(r'^```\w*\n?', '', content)
-        content = re.sub(r'\n?```$', '', content)
+        content = content[3:].lstrip(FENCE_TAG_CHARS)
+        if content.endswith("```"):
+            content = content[:-3]
         content = content.strip()
     
     # Extract the outermost JSON object
-    match = re.search(r'\{[\s\S]*\}', content)
-    if match:
-        content = match.group()
+    start = content.find("{")
+    end = content.rfind("}")
+    if start != -1 and end > start:
+        content = content[start:end + 1]
     
     try:
-        result = json.loads(content)
+        result = orjson.loads(content)
         if isinstance(result, dict):
             return result
-        return {"text": content}
-    except json.JSONDecodeError as e:
-        print(f"[parse] JSON error: {e} — preview: {content[:200]}")
-        return {"text": content}
+        return {"text": content, "_parse_error": True}
+    except orjson.JSONDecodeError as e:
+        logger.warning("[parse] JSON error: %s", e)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[parse] preview: %s", content[:200])
+        return {"text": content, "_parse_error": True}
 
 # A2UI Schema definition for LLM context
 A2UI_SCHEMA = """
@@ -236,19 +274,25 @@ Example complex response:
 
 Match response complexity to question complexity. Use real data, not placeholders."""
 
+# Anthropic system block marked for prompt caching, so the shared prefix is
+# served from the provider's cache instead of being re-processed every call.
+# OpenAI caches identical prefixes automatically, which is why SYSTEM_PROMPT
+# must stay free of per-request content.
+ANTHROPIC_SYSTEM = [
+    {"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}},
+]
+
 
-class LLMProvider(ABC):
-    """Abstract base class for LLM providers."""
+class LLMProvider(Protocol):
+    """Interface that LLM providers satisfy structurally (no inheritance)."""
     
     name: str
     models: List[Dict[str, str]]
     
-    @abstractmethod
     def is_available(self) -> bool:
         """Check if this provider is configured and available."""
-        pass
+        ...
     
-    @abstractmethod
     async def generate(
         self, 
         message: str, 
@@ -256,10 +300,19 @@ class LLMProvider(ABC):
         history: Optional[List[Dict[str, str]]] = None
     ) -> Dict[str, Any]:
         """Generate a response for the given message with optional history."""
-        pass
+        ...
+    
+    def stream(
+        self, 
+        message: str, 
+        model: str,
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[str]:
+        """Yield raw response text chunks as the provider produces them."""
+        ...
 
 
-class OpenAIProvider(LLMProvider):
+class OpenAIProvider:
     """OpenAI GPT provider."""
     
     name = "OpenAI"
@@ -270,8 +323,17 @@ class OpenAIProvider(LLMProvider):
         {"id": "gpt-3.5-turbo", "name": "GPT-3.5 Turbo"},
     ]
     
+    # Shared, never-mutated system message prefix for every request
+    _base_messages = ({"role": "system", "content": SYSTEM_PROMPT},)
+    
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY")
+        self._client = None
+        if self.api_key:
+            self._client = openai.AsyncOpenAI(
+                api_key=self.api_key,
+                http_client=build_http_client(),
+            )
     
     def is_available(self) -> bool:
         return bool(self.api_key)
@@ -282,25 +344,9 @@ class OpenAIProvider(LLMProvider):
         model: str = "gpt-4o",
         history: Optional[List[Dict[str, str]]] = None
     ) -> Dict[str, Any]:
-        import openai
-        
-        client = openai.OpenAI(api_key=self.api_key)
-        
-        # Build messages with history
-        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
-        
-        if history:
-            for msg in history:
-                messages.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
-        
-        messages.append({"role": "user", "content": message})
-        
-        response = client.chat.completions.create(
+        response = await self._client.chat.completions.create(
             model=model,
-            messages=messages,
+            messages=self._build_messages(message, history),
             max_tokens=2000,
             temperature=0.7,
             response_format={"type": "json_object"},
@@ -308,9 +354,38 @@ class OpenAIProvider(LLMProvider):
         
         content = response.choices[0].message.content.strip()
         return parse_llm_json(content)
+    
+    async def stream(
+        self, 
+        message: str, 
+        model: str = "gpt-4o",
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[str]:
+        # Context manager closes the upstream stream if the client goes away
+        async with await self._client.chat.completions.create(
+            model=model,
+            messages=self._build_messages(message, history),
+            max_tokens=2000,
+            temperature=0.7,
+            response_format={"type": "json_object"},
+            stream=True,
+        ) as response:
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+    
+    def _build_messages(
+        self, 
+        message: str, 
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> List[Dict[str, str]]:
+        # History items are already {role, content} dicts; pass them through
+        if history:
+            return [*self._base_messages, *history, {"role": "user", "content": message}]
+        return [*self._base_messages, {"role": "user", "content": message}]
 
 
-class AnthropicProvider(LLMProvider):
+class AnthropicProvider:
     """Anthropic Claude provider."""
     
     name = "Anthropic"
@@ -323,6 +398,12 @@ class AnthropicProvider(LLMProvider):
     
     def __init__(self):
         self.api_key = os.getenv("ANTHROPIC_API_KEY")
+        self._client = None
+        if self.api_key:
+            self._client = anthropic.AsyncAnthropic(
+                api_key=self.api_key,
+                http_client=build_http_client(),
+            )
     
     def is_available(self) -> bool:
         return bool(self.api_key)
@@ -333,34 +414,43 @@ class AnthropicProvider(LLMProvider):
         model: str = "claude-sonnet-4-20250514",
         history: Optional[List[Dict[str, str]]] = None
     ) -> Dict[str, Any]:
-        import anthropic
-        
-        client = anthropic.Anthropic(api_key=self.api_key)
-        
-        # Build messages with history
-        messages = []
-        
-        if history:
-            for msg in history:
-                messages.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
-        
-        messages.append({"role": "user", "content": message})
-        
-        response = client.messages.create(
+        response = await self._client.messages.create(
             model=model,
             max_tokens=2000,
-            system=SYSTEM_PROMPT,
-            messages=messages
+            system=ANTHROPIC_SYSTEM,
+            messages=self._build_messages(message, history)
         )
         
         content = response.content[0].text.strip()
         return parse_llm_json(content)
+    
+    async def stream(
+        self, 
+        message: str, 
+        model: str = "claude-sonnet-4-20250514",
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[str]:
+        async with self._client.messages.stream(
+            model=model,
+            max_tokens=2000,
+            system=ANTHROPIC_SYSTEM,
+            messages=self._build_messages(message, history)
+        ) as response:
+            async for text in response.text_stream:
+                yield text
+    
+    def _build_messages(
+        self, 
+        message: str, 
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> List[Dict[str, str]]:
+        # History items are already {role, content} dicts; pass them through
+        if history:
+            return [*history, {"role": "user", "content": message}]
+        return [{"role": "user", "content": message}]
 
 
-class GeminiProvider(LLMProvider):
+class GeminiProvider:
     """Google Gemini provider."""
     
     name = "Google"
@@ -373,6 +463,10 @@ class GeminiProvider(LLMProvider):
     
     def __init__(self):
         self.api_key = os.getenv("GEMINI_API_KEY")
+        self._models: Dict[str, Any] = {}
+        self._model_ids = {m["id"] for m in self.models}
+        if self.api_key:
+            genai.configure(api_key=self.api_key)
     
     def is_available(self) -> bool:
         return bool(self.api_key)
@@ -383,14 +477,47 @@ class GeminiProvider(LLMProvider):
         model: str = "gemini-2.5-flash-preview-05-20",
         history: Optional[List[Dict[str, str]]] = None
     ) -> Dict[str, Any]:
-        import google.generativeai as genai
-        
-        genai.configure(api_key=self.api_key)
-        
-        gen_model = genai.GenerativeModel(
-            model_name=model,
-            system_instruction=SYSTEM_PROMPT
-        )
+        response = await self._send(message, model, history, stream=False)
+        content = response.text.strip()
+        return parse_llm_json(content)
+    
+    async def stream(
+        self, 
+        message: str, 
+        model: str = "gemini-2.5-flash-preview-05-20",
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[str]:
+        response = await self._send(message, model, history, stream=True)
+        async for chunk in response:
+            text = self._chunk_text(chunk)
+            if text:
+                yield text
+    
+    @staticmethod
+    def _chunk_text(chunk) -> str:
+        # .text raises ValueError on chunks without text parts
+        # (e.g. safety or finish-only chunks); skip those
+        try:
+            return chunk.text
+        except ValueError:
+            return ""
+    
+    async def _send(
+        self, 
+        message: str, 
+        model: str,
+        history: Optional[List[Dict[str, str]]],
+        stream: bool
+    ):
+        gen_model = self._models.get(model)
+        if gen_model is None:
+            gen_model = genai.GenerativeModel(
+                model_name=model,
+                system_instruction=SYSTEM_PROMPT
+            )
+            # Only memoize known ids; model comes from the client request
+            if model in self._model_ids:
+                self._models[model] = gen_model
         
         # Build chat history for Gemini
         chat_history = []
@@ -406,12 +533,12 @@ class GeminiProvider(LLMProvider):
         
         if chat_history:
             chat = gen_model.start_chat(history=chat_history)
-            response = chat.send_message(message, generation_config=generation_config)
-        else:
-            response = gen_model.generate_content(message, generation_config=generation_config)
-        
-        content = response.text.strip()
-        return parse_llm_json(content)
+            return await chat.send_message_async(
+                message, generation_config=generation_config, stream=stream
+            )
+        return await gen_model.generate_content_async(
+            message, generation_config=generation_config, stream=stream
+        )
 
 
 class LLMService:
@@ -423,18 +550,25 @@ class LLMService:
             "anthropic": AnthropicProvider(),
             "gemini": GeminiProvider(),
         }
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.dispatchers = {
+            key: ProviderDispatcher(provider)
+            for key, provider in self.providers.items()
+        }
+        # API keys are read from env at startup, so availability is fixed
+        self._available = [
+            {
+                "id": key,
+                "name": provider.name,
+                "models": provider.models,
+            }
+            for key, provider in self.providers.items()
+            if provider.is_available()
+        ]
     
     def get_available_providers(self) -> List[Dict[str, Any]]:
         """Get list of available providers and their models."""
-        available = []
-        for key, provider in self.providers.items():
-            if provider.is_available():
-                available.append({
-                    "id": key,
-                    "name": provider.name,
-                    "models": provider.models,
-                })
-        return available
+        return self._available
     
     def get_provider(self, provider_id: str) -> Optional[LLMProvider]:
         """Get a specific provider by ID."""
@@ -449,68 +583,214 @@ class LLMService:
         provider_id: str, 
         model: str,
         history: Optional[List[Dict[str, str]]] = None,
-        enable_web_search: bool = False
+        enable_web_search: bool = False,
+        cacheable: bool = True
     ) -> Dict[str, Any]:
-        """Generate a response using the specified provider and model."""
-        from tools import web_search, should_search
+        """
+        Generate a response using the specified provider and model.
+        
+        Responses are served from the response cache when possible, and
+        identical concurrent requests share one provider call. Set
+        cacheable=False for calls whose output must not be reused; they
+        bypass both. Queries that trigger a web search are never cached
+        since they depend on real-time data.
+        """
+        from tools import should_search
+        
+        provider = self.get_provider(provider_id)
+        if not provider:
+            raise ValueError(f"Provider '{provider_id}' is not available")
+        
+        wants_search = enable_web_search and should_search(message)
+        
+        key = None
+        if cacheable and response_cache and not wants_search:
+            key = cache_key(provider_id, model, message, history)
+            cached = await response_cache.get(key, provider_id, model, message, history)
+            if cached is not None:
+                return cached
+        
+        if not cacheable:
+            return await self._generate_once(message, provider_id, model, history, wants_search, key)
+        
+        # Single-flight: identical concurrent requests share one provider call
+        flight_key = key or cache_key(provider_id, model, message, history)
+        if wants_search:
+            flight_key += ":search"
+        
+        while True:
+            inflight = self._inflight.get(flight_key)
+            if inflight is None:
+                break
+            try:
+                return copy.deepcopy(await asyncio.shield(inflight))
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The leader was cancelled: re-check so only the first
+                # waiter to get here takes over and the rest wait on it
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[flight_key] = future
+        try:
+            response = await self._generate_once(
+                message, provider_id, model, history, wants_search, key
+            )
+            future.set_result(copy.deepcopy(response))
+            return response
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            if self._inflight.get(flight_key) is future:
+                del self._inflight[flight_key]
+    
+    async def _generate_once(
+        self, 
+        message: str, 
+        provider_id: str, 
+        model: str,
+        history: Optional[List[Dict[str, str]]],
+        wants_search: bool,
+        key: Optional[str]
+    ) -> Dict[str, Any]:
+        """Run search + provider call, storing the result under key if given."""
+        augmented_message, search_metadata = (
+            await self._augment_with_search(message) if wants_search else (message, None)
+        )
+        
+        response = await self.dispatchers[provider_id].submit(augmented_message, model, history)
+        
+        # Don't replay a malformed completion from the cache
+        if key is not None and not response.get("_parse_error"):
+            await response_cache.set(key, provider_id, model, message, response, history)
+        
+        # Add search metadata to response (optional, for debugging)
+        if search_metadata:
+            response["_search"] = search_metadata
+        
+        return response
+    
+    async def stream(
+        self, 
+        message: str, 
+        provider_id: str, 
+        model: str,
+        history: Optional[List[Dict[str, str]]] = None,
+        enable_web_search: bool = False,
+        cacheable: bool = True
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Stream a response as (event, data) pairs.
+        
+        Yields ("delta", {"text": chunk}) for each raw text chunk from the
+        provider, then a single ("result", response) with the parsed A2UI
+        response. Cache hits skip straight to the result.
+        """
+        from tools import should_search
         
         provider = self.get_provider(provider_id)
         if not provider:
             raise ValueError(f"Provider '{provider_id}' is not available")
         
-        # Perform web search if enabled and query seems to need current info
+        wants_search = enable_web_search and should_search(message)
+        
+        key = None
+        if cacheable and response_cache and not wants_search:
+            key = cache_key(provider_id, model, message, history)
+            cached = await response_cache.get(key, provider_id, model, message, history)
+            if cached is not None:
+                yield "result", cached
+                return
+        
+        augmented_message, search_metadata = (
+            await self._augment_with_search(message) if wants_search else (message, None)
+        )
+        
+        chunks = []
+        dispatcher = self.dispatchers[provider_id]
+        async for text in dispatcher.stream(augmented_message, model, history):
+            chunks.append(text)
+            yield "delta", {"text": text}
+        
+        response = parse_llm_json("".join(chunks))
+        
+        if key is not None and not response.get("_parse_error"):
+            await response_cache.set(key, provider_id, model, message, response, history)
+        
+        if search_metadata:
+            response["_search"] = search_metadata
+        
+        yield "result", response
+    
+    async def _augment_with_search(
+        self, 
+        message: str
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Run a web search and prepend its results to the message as context."""
+        from tools import web_search
+        
         augmented_message = message
         search_metadata = None
         
-        if enable_web_search and should_search(message):
-            if web_search.is_available():
-                print(f"🔍 Performing web search for: {message[:50]}...")
-                try:
-                    search_results = await web_search.search(message)
-                    context = web_search.format_for_context(search_results)
-                    
-                    if context:
-                        # Search succeeded - add context
-                        augmented_message = f"{context}\n\nUser question: {message}"
-                        image_count = len(search_results.get('images', []))
-                        print(f"✓ Web search complete, {len(search_results.get('results', []))} results, {image_count} images")
-                        search_metadata = {
-                            "searched": True,
-                            "success": True,
-                            "results_count": len(search_results.get('results', [])),
-                            "images_count": image_count,
-                        }
-                    else:
-                        # Search failed - continue without context
-                        error_type = search_results.get('error', 'unknown')
-                        print(f"⚠️  Web search failed ({error_type}), continuing without search results")
-                        search_metadata = {
-                            "searched": True,
-                            "success": False,
-                            "error": error_type
-                        }
-                except Exception as e:
-                    # Catch any unexpected errors and continue gracefully
-                    print(f"⚠️  Web search error (continuing anyway): {e}")
+        if web_search.is_available():
+            logger.info("Performing web search for: %.50s...", message)
+            try:
+                search_results = await asyncio.wait_for(
+                    web_search.search(message), SEARCH_TIMEOUT
+                )
+                context = web_search.format_for_context(search_results)
+                
+                if context:
+                    # Search succeeded - add context
+                    augmented_message = f"{context}\n\nUser question: {message}"
+                    image_count = len(search_results.get('images', []))
+                    logger.info(
+                        "Web search complete, %d results, %d images",
+                        len(search_results.get('results', [])), image_count,
+                    )
+                    search_metadata = {
+                        "searched": True,
+                        "success": True,
+                        "results_count": len(search_results.get('results', [])),
+                        "images_count": image_count,
+                    }
+                else:
+                    # Search failed - continue without context
+                    error_type = search_results.get('error', 'unknown')
+                    logger.warning("Web search failed (%s), continuing without search results", error_type)
                     search_metadata = {
                         "searched": True,
                         "success": False,
-                        "error": "exception"
+                        "error": error_type
                     }
-            else:
-                print("ℹ️  Web search requested but not configured, using AI knowledge only")
+            except asyncio.TimeoutError:
+                logger.warning("Web search timed out after %.1fs, continuing without search results", SEARCH_TIMEOUT)
                 search_metadata = {
-                    "searched": False,
-                    "reason": "not_configured"
+                    "searched": True,
+                    "success": False,
+                    "error": "timeout"
                 }
+            except Exception as e:
+                # Catch any unexpected errors and continue gracefully
+                logger.warning("Web search error (continuing anyway): %s", e)
+                search_metadata = {
+                    "searched": True,
+                    "success": False,
+                    "error": "exception"
+                }
+        else:
+            logger.info("Web search requested but not configured, using AI knowledge only")
+            search_metadata = {
+                "searched": False,
+                "reason": "not_configured"
+            }
         
-        response = await provider.generate(augmented_message, model, history)
-        
-        # Add search metadata to response (optional, for debugging)
-        if search_metadata:
-            response["_search"] = search_metadata
-        
-        return response
+        return augmented_message, search_metadata
 
 
 # Global instance
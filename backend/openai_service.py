@@ -1,7 +1,10 @@
 
+import logging
 import os
 import openai
 
+logger = logging.getLogger(f"a2ui.{__name__}")
+
 # Load OpenAI API key from environment variable
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
@@ -20,5 +23,5 @@ def get_openai_completion(prompt: str, model: str = "gpt-3.5-turbo", max_tokens:
         )
         return {"response": response.choices[0].message.content.strip(), "status_code": 200}
     except Exception as e:
-        print(f"OpenAI error: {e}")
+        logger.exception("OpenAI error: %s", e)
         return {"error": "An error occurred processing your request", "status_code": 500}
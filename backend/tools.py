@@ -6,9 +6,13 @@ Provides tool integrations for enhanced AI capabilities:
 - More tools can be added here
 """
 
+import asyncio
+import logging
 import os
 from typing import Any, Dict, List, Optional
 
+logger = logging.getLogger(f"a2ui.{__name__}")
+
 
 class WebSearchTool:
     """Web search using Tavily API for real-time information."""
@@ -38,7 +42,7 @@ class WebSearchTool:
             Dict with 'results' list, optional 'answer' summary, and 'success' flag
         """
         if not self.is_available():
-            print("⚠️  Web search: No API key configured")
+            logger.warning("Web search: No API key configured")
             return {
                 "success": False,
                 "error": "not_configured",
@@ -51,7 +55,9 @@ class WebSearchTool:
             
             client = TavilyClient(api_key=self.api_key)
             
-            response = client.search(
+            # TavilyClient is synchronous; run it off the event loop
+            response = await asyncio.to_thread(
+                client.search,
                 query=query,
                 max_results=max_results,
                 search_depth=search_depth,
@@ -88,7 +94,7 @@ class WebSearchTool:
             }
             
         except ImportError:
-            print("⚠️  Web search: Tavily package not installed")
+            logger.warning("Web search: Tavily package not installed")
             return {
                 "success": False,
                 "error": "package_missing",
@@ -100,7 +106,7 @@ class WebSearchTool:
             
             # Detect common error types
             if "rate limit" in error_msg or "429" in error_msg:
-                print("⚠️  Web search: Rate limit exceeded")
+                logger.warning("Web search: Rate limit exceeded")
                 return {
                     "success": False,
                     "error": "rate_limit",
@@ -108,7 +114,7 @@ class WebSearchTool:
                     "results": []
                 }
             elif "401" in error_msg or "unauthorized" in error_msg or "invalid" in error_msg:
-                print("⚠️  Web search: Invalid API key")
+                logger.warning("Web search: Invalid API key")
                 return {
                     "success": False,
                     "error": "invalid_key",
@@ -116,7 +122,7 @@ class WebSearchTool:
                     "results": []
                 }
             elif "timeout" in error_msg:
-                print(f"⚠️  Web search: Timeout - {e}")
+                logger.warning("Web search: Timeout - %s", e)
                 return {
                     "success": False,
                     "error": "timeout",
@@ -124,7 +130,7 @@ class WebSearchTool:
                     "results": []
                 }
             else:
-                print(f"⚠️  Web search failed: {e}")
+                logger.warning("Web search failed: %s", e)
                 return {
                     "success": False,
                     "error": "unknown",